@@ -0,0 +1,271 @@
+"""
+Shared DuckDB runner for the standalone extension test scripts.
+
+test_documented_features.py and test_security_validation.py both drive the
+built DuckDB CLI through BaseTester; each subclass only defines its SQL and
+test methods.
+"""
+
+import asyncio
+import atexit
+import contextlib
+import contextvars
+import io
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# DuckDB error messages the tests classify stderr by, matched in a single pass per run
+_ERR_PAT = re.compile(
+    b'(No MCP commands are allowed|immutable once set|not allowed|Allowed commands'
+    b'|Set allowed_mcp_commands setting first)'
+)
+
+# Absolute so the DuckDB children can run from any working directory
+EXTENSION_PATH = (
+    Path(__file__).resolve().parent.parent / "build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension"
+)
+EXTENSION_LOAD_SQL = f"LOAD '{EXTENSION_PATH}';"
+
+# Per-task output buffer used by _TaskBufferedStdout
+_test_output = contextvars.ContextVar('test_output', default=None)
+
+
+class _TaskBufferedStdout:
+    """stdout replacement that buffers writes per asyncio task while tests run concurrently.
+
+    contextlib.redirect_stdout swaps the process-wide sys.stdout, so it cannot give each
+    task its own StringIO; this object is installed once and routes each write to the
+    buffer held in the context of the task that made it.
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+
+    def start(self):
+        _test_output.set(io.StringIO())
+
+    def finish(self):
+        return _test_output.get().getvalue()
+
+    def write(self, text):
+        return (_test_output.get() or self._fallback).write(text)
+
+    def flush(self):
+        self._fallback.flush()
+
+
+def requires(*test_names):
+    """Mark a test as skipped, rather than run, when any of the named tests fails."""
+
+    def decorate(test):
+        test._requires = test_names
+        return test
+
+    return decorate
+
+
+class BaseTester:
+    BATCH_MARKER = "===MCP-TEST-BATCH==="
+
+    # Seconds for a whole run_all_*tests() pass, shared by every DuckDB child it starts;
+    # CALL_TIMEOUT still bounds each child, so one hung ATTACH cannot eat the whole budget
+    RUN_BUDGET = 180
+    CALL_TIMEOUT = 30
+
+    EXTENSION_LOAD_SQL = EXTENSION_LOAD_SQL
+
+    # Subclasses list their configuration probe scripts here for _run_probe_batch
+    PROBE_SQL = []
+
+    # How a test that raised is reported
+    EXCEPTION_LABEL = "Test"
+
+    def __init__(self):
+        self.project_root = Path(__file__).parent.parent
+        # Resolved and checked once; every spawn reuses the canonical path
+        self.duckdb_path = (self.project_root / "build/release/duckdb").resolve()
+        self.duckdb_available = self.duckdb_path.is_file()
+        # Per-run results as parallel lists, one entry per DuckDB run (or batched script)
+        self._descriptions = []
+        self._successes = []
+        self._stderrs = []
+        self._errors = []
+        # Tests' leading LOAD statement is run once per process from a shared -init script
+        fd, init_path = tempfile.mkstemp(prefix='duckdb_mcp_init_', suffix='.sql')
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.EXTENSION_LOAD_SQL + '\n')
+        self._init_sql = Path(init_path)
+        atexit.register(self._init_sql.unlink, missing_ok=True)
+        # Command lines for the DuckDB children, built once rather than per test
+        # -json: results come back as compact JSON rather than rendered box tables
+        self._init_cmd = (str(self.duckdb_path), '-json', '-init', str(self._init_sql))
+        self._plain_cmd = (str(self.duckdb_path), '-json')
+        # Output of scripts already run by _run_probe_batch, keyed by SQL text
+        self._batched_stdout = {}
+        # Monotonic deadline for the current full run, None outside of one
+        self._deadline = None
+
+    @staticmethod
+    def _sql_text(sql_commands):
+        return '\n'.join(sql_commands) if isinstance(sql_commands, list) else sql_commands
+
+    def _run_probe_batch(self, scripts):
+        """Run several configuration probe scripts in one DuckDB process.
+
+        Each script runs in its own fresh in-memory database (.open), so the allowlist it sets
+        cannot leak into the next one. Each script's stdout is kept for the test that later
+        runs the same SQL. If the batch fails nothing is kept, so every script falls back to
+        its own process and any error stays attributable to a single test.
+        """
+        script_lines = []
+        for sql_commands in scripts:
+            script_lines.append(".open :memory:")
+            script_lines.append(f".print {self.BATCH_MARKER}")
+            script_lines.append(self._sql_text(sql_commands))
+        script = '\n'.join(script_lines) + '\n'
+
+        try:
+            result = subprocess.run(
+                self._plain_cmd,
+                input=script.encode(),
+                capture_output=True,
+                timeout=self._timeout(),
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return
+
+        outputs = result.stdout.split(f"{self.BATCH_MARKER}\n".encode())[1:]
+        if result.returncode != 0 or result.stderr or len(outputs) != len(scripts):
+            return
+
+        for sql_commands, stdout in zip(scripts, outputs):
+            self._batched_stdout[self._sql_text(sql_commands)] = stdout
+
+    def _timeout(self):
+        """Seconds a DuckDB child may run: CALL_TIMEOUT, capped by what is left of a full run."""
+        if self._deadline is None:
+            return self.CALL_TIMEOUT
+        return min(self.CALL_TIMEOUT, max(0.1, self._deadline - time.monotonic()))
+
+    @staticmethod
+    def _decode(output):
+        """Decode captured DuckDB output for display; checks work on the raw bytes."""
+        return output.decode('utf-8', errors='replace')
+
+    def _stderr_text(self, result, default=''):
+        return self._decode(result['stderr']) if 'stderr' in result else default
+
+    def _record_result(self, description, success, stderr=b'', error=''):
+        self._descriptions.append(description)
+        self._successes.append(success)
+        self._stderrs.append(stderr)
+        self._errors.append(error)
+
+    async def _invoke_test(self, test, buffered_stdout, prerequisites):
+        """Run one test coroutine, returning its buffered output and whether it passed."""
+        failed = [name for name, task in prerequisites if not (await task)[1]]
+        buffered_stdout.start()
+        if failed:
+            print(f"\n⏭️  Skipping {test.__name__}: requires {', '.join(failed)}")
+            return buffered_stdout.finish(), False
+        try:
+            passed = bool(await test())
+        except Exception as e:
+            print(f"❌ {self.EXCEPTION_LABEL} failed with exception: {e}")
+            passed = False
+        return buffered_stdout.finish(), passed
+
+    async def _gather_tests(self, tests, buffered_stdout):
+        """Run tests concurrently; each waits only for the tests named in its _requires."""
+        tasks = {}
+        for test in tests:
+            prerequisites = [(name, tasks[name]) for name in getattr(test, '_requires', ())]
+            tasks[test.__name__] = asyncio.create_task(self._invoke_test(test, buffered_stdout, prerequisites))
+        return await asyncio.gather(*tasks.values())
+
+    def _run_tests(self, tests):
+        """Run the probe batch and then all tests, printing their output; returns the pass count."""
+        self._deadline = time.monotonic() + self.RUN_BUDGET
+        try:
+            self._run_probe_batch(self.PROBE_SQL)
+
+            # Each test waits on its own DuckDB processes, so run them as concurrent tasks to overlap
+            # those waits; output is buffered per test and printed in the original order
+            buffered_stdout = _TaskBufferedStdout(sys.stdout)
+            with contextlib.redirect_stdout(buffered_stdout):
+                outcomes = asyncio.run(self._gather_tests(tests, buffered_stdout))
+        finally:
+            # A later standalone run_sql() gets the plain per-call limit again
+            self._deadline = None
+
+        # All buffered test output goes out in a single write once every test has finished
+        outputs, results = zip(*outcomes)
+        sys.stdout.write(''.join(outputs))
+        sys.stdout.flush()
+        return sum(results)
+
+    def _without_extension_load(self, sql_commands):
+        """Drop a leading LOAD of the extension, which the -init script already runs."""
+        if isinstance(sql_commands, list) and sql_commands[:1] == [self.EXTENSION_LOAD_SQL]:
+            return sql_commands[1:]
+        return sql_commands
+
+    def run_sql(self, sql_commands, description="SQL Test", load_via_init=True):
+        """Execute SQL commands in DuckDB and return result"""
+        return asyncio.run(self._run_sql_async(sql_commands, description, load_via_init))
+
+    async def _run_sql_async(self, sql_commands, description="SQL Test", load_via_init=True):
+        """Execute SQL commands in a DuckDB child process without blocking the event loop.
+
+        With load_via_init the extension is loaded by the shared -init script; tests that
+        check LOAD itself pass load_via_init=False so a failing LOAD fails the run.
+        """
+        batched_stdout = self._batched_stdout.pop(self._sql_text(sql_commands), None)
+        if batched_stdout is not None:
+            self._record_result(description, True)
+            return {'success': True, 'stdout': batched_stdout, 'stderr': b'', 'errors': frozenset(), 'returncode': 0}
+
+        try:
+            cmd = self._plain_cmd
+            script = sql_commands
+            if load_via_init:
+                cmd = self._init_cmd
+                script = self._without_extension_load(sql_commands)
+
+            # Execute SQL, piped to DuckDB on stdin
+            timeout = self._timeout()
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    proc.communicate(self._sql_text(script).encode()), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise subprocess.TimeoutExpired(cmd, timeout) from None
+            result = subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+            success = result.returncode == 0
+            self._record_result(description, success, stderr=result.stderr)
+
+            return {
+                'success': success,
+                'stdout': result.stdout,
+                'stderr': result.stderr,
+                'errors': frozenset(_ERR_PAT.findall(result.stderr)),
+                'returncode': result.returncode,
+            }
+
+        except Exception as e:
+            self._record_result(description, False, error=str(e))
+            return {'success': False, 'error': str(e), 'errors': frozenset()}
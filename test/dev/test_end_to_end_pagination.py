@@ -5,9 +5,12 @@ Tests DuckDB MCP extension with pagination-enabled MCP server.
 """
 
 import asyncio
+import json
 import subprocess
 import sys
 import os
+import re
+import tempfile
 import time
 import logging
 from pathlib import Path
@@ -18,42 +21,120 @@ logger = logging.getLogger(__name__)
 
 
 class E2EPaginationTest:
+    # Run between command groups by run_all_duckdb; its result box is what splits the output
+    SEPARATOR_SQL = "SELECT '===SEP==='"
+    _SEPARATOR_OUTPUT = re.compile(r"^┌─*┐\n(?:[│├].*\n)*?│ *===SEP=== *│\n└─*┘\n", re.MULTILINE)
+
+    BASIC_CONNECTION_SQL = [
+        "PRAGMA enable_mcp_extension",
+        "SELECT mcp_server_start('pagination_server', 'stdio', '/mnt/aux-data/teague/Projects/duckdb_mcp/venv/bin/python', '-u', '/mnt/aux-data/teague/Projects/duckdb_mcp/test/fastmcp/pagination_test_server.py')",
+        "SELECT mcp_server_status('pagination_server')",
+    ]
+
+    PAGINATION_FUNCTIONS_SQL = [
+        "PRAGMA enable_mcp_extension",
+        "SELECT mcp_server_start('pagination_server', 'stdio', '/mnt/aux-data/teague/Projects/duckdb_mcp/venv/bin/python', '-u', '/mnt/aux-data/teague/Projects/duckdb_mcp/test/fastmcp/pagination_test_server.py')",
+        "SELECT mcp_list_resources_paginated('pagination_server', '') as page1",
+        "SELECT mcp_list_prompts_paginated('pagination_server', '') as prompts_page1",
+        "SELECT mcp_list_tools_paginated('pagination_server', '') as tools_page1",
+    ]
+
+    CURSOR_NAVIGATION_SQL = [
+        "PRAGMA enable_mcp_extension",
+        "SELECT mcp_server_start('pagination_server', 'stdio', '/mnt/aux-data/teague/Projects/duckdb_mcp/venv/bin/python', '-u', '/mnt/aux-data/teague/Projects/duckdb_mcp/test/fastmcp/pagination_test_server.py')",
+        # Get first page
+        "WITH page1 AS (SELECT mcp_list_resources_paginated('pagination_server', '') as result) SELECT result.next_cursor FROM page1",
+        # Use cursor for second page
+        "WITH page1 AS (SELECT mcp_list_resources_paginated('pagination_server', '') as result), page2 AS (SELECT mcp_list_resources_paginated('pagination_server', page1.result.next_cursor) as result FROM page1) SELECT page2.result.has_more_pages FROM page2",
+    ]
+
     def __init__(self):
         self.project_root = Path(__file__).parent
         self.duckdb_path = self.project_root / "build" / "release" / "duckdb"
         self.server_path = self.project_root / "test" / "fastmcp" / "pagination_test_server.py"
         self.venv_python = self.project_root / "venv" / "bin" / "python"
         self.server_process = None
+        self._server_stderr = None
 
-    async def start_mcp_server(self):
-        """Start the MCP pagination test server."""
+    async def start_mcp_server(self, timeout: float = 10.0):
+        """Start the MCP pagination test server and wait until it answers initialize."""
         logger.info("Starting MCP pagination test server...")
 
         cmd = [str(self.venv_python), str(self.server_path)]
 
+        # The server logs at DEBUG to stderr; nothing reads it while the tests run, so it goes to
+        # a temp file rather than a pipe a full buffer could stall, and is logged if startup fails.
+        self._server_stderr = tempfile.TemporaryFile()
         self.server_process = subprocess.Popen(
             cmd,
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+            stderr=self._server_stderr,
             cwd=str(self.project_root),
         )
 
         logger.info(f"MCP server started with PID: {self.server_process.pid}")
 
-        # Give server time to initialize
-        await asyncio.sleep(2)
-
-        if self.server_process.poll() is not None:
-            stdout, stderr = self.server_process.communicate()
-            logger.error(f"MCP server failed to start:")
-            logger.error(f"STDOUT: {stdout}")
-            logger.error(f"STDERR: {stderr}")
+        ready, stdout = await self._wait_until_ready(timeout)
+        if not ready:
+            returncode = self.server_process.poll()
+            if returncode is None:
+                logger.error(f"MCP server did not answer initialize within {timeout}s")
+            else:
+                logger.error(f"MCP server exited during startup with return code {returncode}")
+            self._server_stderr.seek(0)
+            logger.error(f"STDOUT: {stdout.decode(errors='replace')}")
+            logger.error(f"STDERR: {self._server_stderr.read().decode(errors='replace')}")
             raise RuntimeError("Failed to start MCP server")
 
         return self.server_process
 
+    async def _wait_until_ready(self, timeout: float) -> tuple[bool, bytes]:
+        """Send an initialize request and poll stdout for its JSON-RPC reply.
+
+        Returns whether the reply arrived, along with everything read from stdout.
+        """
+        init_request = {
+            "jsonrpc": "2.0",
+            "id": 0,
+            "method": "initialize",
+            "params": {
+                "protocolVersion": "2024-11-05",
+                "clientInfo": {"name": "E2E Pagination Test", "version": "1.0"},
+                "capabilities": {},
+            },
+        }
+        self.server_process.stdin.write((json.dumps(init_request) + "\n").encode())
+        self.server_process.stdin.flush()
+
+        stdout_fd = self.server_process.stdout.fileno()
+        os.set_blocking(stdout_fd, False)
+
+        buffer = b""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                chunk = os.read(stdout_fd, 65536)
+            except BlockingIOError:
+                chunk = None
+
+            if chunk == b"":
+                return False, buffer  # EOF: server exited
+            if chunk:
+                buffer += chunk
+                *lines, _ = buffer.split(b"\n")
+                for line in lines:
+                    try:
+                        reply = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(reply, dict) and reply.get("id") == 0:
+                        return True, buffer
+
+            await asyncio.sleep(0.02)
+
+        return False, buffer
+
     def stop_mcp_server(self):
         """Stop the MCP server."""
         if self.server_process:
@@ -65,6 +146,7 @@ class E2EPaginationTest:
                 logger.warning("Server didn't stop gracefully, forcing kill...")
                 self.server_process.kill()
                 self.server_process.wait()
+            self._server_stderr.close()
             logger.info("MCP server stopped")
 
     def run_duckdb_test(self, sql_commands: list[str]) -> str:
@@ -93,72 +175,92 @@ class E2EPaginationTest:
             logger.error(f"Failed to run DuckDB command: {e}")
             return f"ERROR: {e}"
 
+    def run_all_duckdb(self, sql_groups: list[list[str]]) -> list[str]:
+        """Run several groups of DuckDB commands in one process and return output per group."""
+        logger.info(f"Running {len(sql_groups)} DuckDB command groups in a single process...")
+
+        # Groups are joined into one -c script with a sentinel SELECT between them, so stdout
+        # can be split back per group. Leading setup commands an earlier group already ran
+        # (extension pragma, server start) are skipped so the first group's server is reused.
+        commands = []
+        issued = set()
+        for index, sql_commands in enumerate(sql_groups):
+            if index:
+                commands.append(self.SEPARATOR_SQL)
+            skipping_setup = True
+            for command in sql_commands:
+                if skipping_setup and command in issued:
+                    continue
+                skipping_setup = False
+                issued.add(command)
+                commands.append(command)
+        combined_sql = "; ".join(commands)
+
+        cmd = [str(self.duckdb_path), "-c", combined_sql]
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60, cwd=str(self.project_root))
+        except subprocess.TimeoutExpired:
+            logger.error("DuckDB command timed out")
+            return ["ERROR: Command timed out"] * len(sql_groups)
+        except Exception as e:
+            logger.error(f"Failed to run DuckDB command: {e}")
+            return [f"ERROR: {e}"] * len(sql_groups)
+
+        outputs = self._SEPARATOR_OUTPUT.split(result.stdout)
+        if result.returncode == 0:
+            if len(outputs) != len(sql_groups):
+                return [f"ERROR: expected {len(sql_groups)} output groups, got {len(outputs)}"] * len(sql_groups)
+            return outputs
+
+        # DuckDB stops at the first failing statement: the separators printed so far tell which
+        # group it was in. Groups after it never ran, so they get a process of their own.
+        failed = min(len(outputs), len(sql_groups)) - 1
+        logger.error(f"DuckDB command failed with return code {result.returncode}")
+        logger.error(f"STDERR: {result.stderr}")
+        remaining = self.run_all_duckdb(sql_groups[failed + 1 :]) if failed + 1 < len(sql_groups) else []
+        return outputs[:failed] + [f"ERROR: {result.stderr}"] + remaining
+
     def test_basic_connection(self):
         """Test basic MCP server connection."""
         logger.info("Testing basic MCP connection...")
 
-        sql_commands = [
-            "PRAGMA enable_mcp_extension",
-            "SELECT mcp_server_start('pagination_server', 'stdio', '/home/teague/.local/bin/python', '-u', '/mnt/aux-data/teague/Projects/duckdb_mcp/test/fastmcp/pagination_test_server.py')",
-            "SELECT mcp_server_status('pagination_server')",
-        ]
-
-        return self.run_duckdb_test(sql_commands)
+        return self.run_duckdb_test(self.BASIC_CONNECTION_SQL)
 
     def test_pagination_functions(self):
         """Test pagination functions with real server."""
         logger.info("Testing pagination functions...")
 
-        sql_commands = [
-            "PRAGMA enable_mcp_extension",
-            "SELECT mcp_server_start('pagination_server', 'stdio', '/mnt/aux-data/teague/Projects/duckdb_mcp/venv/bin/python', '-u', '/mnt/aux-data/teague/Projects/duckdb_mcp/test/fastmcp/pagination_test_server.py')",
-            "SELECT mcp_list_resources_paginated('pagination_server', '') as page1",
-            "SELECT mcp_list_prompts_paginated('pagination_server', '') as prompts_page1",
-            "SELECT mcp_list_tools_paginated('pagination_server', '') as tools_page1",
-        ]
-
-        return self.run_duckdb_test(sql_commands)
+        return self.run_duckdb_test(self.PAGINATION_FUNCTIONS_SQL)
 
     def test_cursor_navigation(self):
         """Test cursor-based pagination navigation."""
         logger.info("Testing cursor navigation...")
 
-        sql_commands = [
-            "PRAGMA enable_mcp_extension",
-            "SELECT mcp_server_start('pagination_server', 'stdio', '/mnt/aux-data/teague/Projects/duckdb_mcp/venv/bin/python', '-u', '/mnt/aux-data/teague/Projects/duckdb_mcp/test/fastmcp/pagination_test_server.py')",
-            # Get first page
-            "WITH page1 AS (SELECT mcp_list_resources_paginated('pagination_server', '') as result) SELECT result.next_cursor FROM page1",
-            # Use cursor for second page
-            "WITH page1 AS (SELECT mcp_list_resources_paginated('pagination_server', '') as result), page2 AS (SELECT mcp_list_resources_paginated('pagination_server', page1.result.next_cursor) as result FROM page1) SELECT page2.result.has_more_pages FROM page2",
-        ]
-
-        return self.run_duckdb_test(sql_commands)
+        return self.run_duckdb_test(self.CURSOR_NAVIGATION_SQL)
 
     async def run_all_tests(self):
         """Run all end-to-end tests."""
         logger.info("Starting end-to-end pagination tests...")
 
         tests = [
-            ("Basic Connection Test", self.test_basic_connection),
-            ("Pagination Functions Test", self.test_pagination_functions),
-            ("Cursor Navigation Test", self.test_cursor_navigation),
+            ("Basic Connection Test", self.BASIC_CONNECTION_SQL),
+            ("Pagination Functions Test", self.PAGINATION_FUNCTIONS_SQL),
+            ("Cursor Navigation Test", self.CURSOR_NAVIGATION_SQL),
         ]
 
         results = {}
 
-        for test_name, test_func in tests:
+        outputs = self.run_all_duckdb([sql_commands for _, sql_commands in tests])
+
+        for (test_name, _), result in zip(tests, outputs):
             logger.info(f"Running: {test_name}")
-            try:
-                result = test_func()
-                results[test_name] = result
+            results[test_name] = result
+            if "ERROR" not in result and "EXCEPTION" not in result:
                 logger.info(f"✅ {test_name} completed")
-                if "ERROR" not in result:
-                    logger.info(f"Result preview: {result[:200]}...")
-                else:
-                    logger.error(f"❌ {test_name} failed: {result}")
-            except Exception as e:
-                results[test_name] = f"EXCEPTION: {e}"
-                logger.error(f"❌ {test_name} threw exception: {e}")
+                logger.info(f"Result preview: {result[:200]}...")
+            else:
+                logger.error(f"❌ {test_name} failed: {result}")
 
         return results
 
@@ -0,0 +1,76 @@
+"""
+Minimal stdio JSON-RPC helpers shared by the fastmcp protocol test scripts.
+"""
+
+import asyncio
+import json
+
+# StreamReader line limit for the server's stdout; a single resources/read reply can be far
+# larger than asyncio's 64 KiB default
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+class PipelinedClient:
+    """Minimal JSON-RPC client that matches responses to requests by id."""
+
+    def __init__(self, process):
+        self.process = process
+        self.pending = {}
+        self.next_id = 1
+        # Why read_responses stopped, once it has
+        self.error = None
+
+    async def read_responses(self):
+        """Resolve pending requests from newline-delimited JSON on stdout.
+
+        Whatever stops the reader, every request still pending fails with the reason rather
+        than waiting until the caller's timeout.
+        """
+        try:
+            while True:
+                line = await self.process.stdout.readuntil(b'\n')
+                try:
+                    response = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"Failed to parse line: {line[:100]}... Error: {e}")
+                    continue
+                if not isinstance(response, dict):
+                    print(f"Ignoring non-object line: {line[:100]}...")
+                    continue
+                future = self.pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except asyncio.IncompleteReadError:
+            self.error = ConnectionError("Server closed stdout")
+        except Exception as e:
+            self.error = ConnectionError(f"Reading server stdout failed: {e!r}")
+
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(self.error)
+        self.pending.clear()
+
+    async def send(self, message):
+        self.process.stdin.write((json.dumps(message) + '\n').encode())
+        await self.process.stdin.drain()
+
+    async def request(self, method, params):
+        if self.error is not None:
+            raise self.error
+        request_id = self.next_id
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        await self.send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        return await future
+
+
+async def stop_process(process, timeout=2):
+    """Terminate the server, killing it if it has not exited within timeout seconds."""
+    if process.returncode is None:
+        process.terminate()
+    try:
+        await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
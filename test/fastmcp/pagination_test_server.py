@@ -5,8 +5,12 @@ Implements cursor-based pagination following MCP specification.
 """
 
 import json
+import os
 import sys
 import logging
+from dataclasses import asdict, dataclass
+from functools import cache, lru_cache
+from operator import attrgetter
 from typing import Any, Optional
 from mcp.server import Server
 from mcp.types import (
@@ -15,17 +19,40 @@ from mcp.types import (
     CallToolResult,
     TextContent,
     Prompt,
+    PromptArgument,
 )
-import base64
+from pydantic import AnyUrl
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+if orjson is not None:
+
+    def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize to compact (or 2-space indented) JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+else:
+
+    def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize to compact (or 2-space indented) JSON bytes."""
+        if indent:
+            return json.dumps(obj, indent=2).encode()
+        return json.dumps(obj, separators=(',', ':')).encode()
+
 
 # Set up logging
 log_file = '/mnt/aux-data/teague/Projects/duckdb_mcp/mcp_pagination_server.log'
+# Per-request DEBUG/INFO lines only reach the log file when MCP_TEST_SERVER_DEBUG is set
+file_log_level = logging.DEBUG if os.environ.get('MCP_TEST_SERVER_DEBUG') else logging.WARNING
 
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
 
 file_handler = logging.FileHandler(log_file, mode='w')
-file_handler.setLevel(logging.DEBUG)
+file_handler.setLevel(file_log_level)
 file_formatter = logging.Formatter('[MCP-PAGINATION-SERVER] %(asctime)s - %(levelname)s - %(message)s')
 file_handler.setFormatter(file_formatter)
 logger.addHandler(file_handler)
@@ -36,11 +63,45 @@ stderr_formatter = logging.Formatter('[MCP-PAGINATION] %(asctime)s - %(levelname
 stderr_handler.setFormatter(stderr_formatter)
 logger.addHandler(stderr_handler)
 
-logger.info(f"MCP Pagination Server logging to: {log_file}")
+logger.info("MCP Pagination Server logging to: %s", log_file)
+
+
+# Records for the generated test data; slotted so 1200 of them stay small
+@dataclass(slots=True, frozen=True)
+class ResourceRecord:
+    id: str
+    uri: str
+    name: str
+    description: str
+    category: str
+    size: int
+    created_at: str
+    mime_type: str
+
+
+@dataclass(slots=True, frozen=True)
+class ToolRecord:
+    id: str
+    name: str
+    description: str
+    type: str
+    version: str
+    parameters: tuple[str, ...]
+    category: str
+
+
+@dataclass(slots=True, frozen=True)
+class PromptRecord:
+    id: str
+    name: str
+    description: str
+    type: str
+    template: str
+    parameters: dict[str, dict]
 
 
 # Generate large dataset for pagination testing
-def generate_large_resources(count: int) -> list[dict]:
+def generate_large_resources(count: int) -> list[ResourceRecord]:
     """Generate a large number of test resources."""
     resources = []
     categories = ['data', 'config', 'logs', 'reports', 'backups']
@@ -48,22 +109,22 @@ def generate_large_resources(count: int) -> list[dict]:
     for i in range(count):
         category = categories[i % len(categories)]
         resources.append(
-            {
-                'id': f'resource_{i:06d}',
-                'uri': f'test://{category}/resource_{i:06d}.json',
-                'name': f'Resource {i:06d}',
-                'description': f'Test resource {i} in category {category}',
-                'category': category,
-                'size': 1024 + (i * 47) % 10000,  # Varying sizes
-                'created_at': f'2024-01-{(i % 28) + 1:02d}T10:{(i % 60):02d}:00Z',
-                'mime_type': 'application/json',
-            }
+            ResourceRecord(
+                id=f'resource_{i:06d}',
+                uri=f'test://{category}/resource_{i:06d}.json',
+                name=f'Resource {i:06d}',
+                description=f'Test resource {i} in category {category}',
+                category=category,
+                size=1024 + (i * 47) % 10000,  # Varying sizes
+                created_at=f'2024-01-{(i % 28) + 1:02d}T10:{(i % 60):02d}:00Z',
+                mime_type='application/json',
+            )
         )
 
     return resources
 
 
-def generate_large_tools(count: int) -> list[dict]:
+def generate_large_tools(count: int) -> list[ToolRecord]:
     """Generate a large number of test tools."""
     tools = []
     tool_types = ['data_processor', 'analyzer', 'transformer', 'validator', 'exporter']
@@ -71,21 +132,21 @@ def generate_large_tools(count: int) -> list[dict]:
     for i in range(count):
         tool_type = tool_types[i % len(tool_types)]
         tools.append(
-            {
-                'id': f'tool_{i:06d}',
-                'name': f'{tool_type}_{i:06d}',
-                'description': f'Test {tool_type} tool number {i}',
-                'type': tool_type,
-                'version': f'1.{i % 10}.{i % 100}',
-                'parameters': ['input', 'output', 'config'][: (i % 3) + 1],
-                'category': tool_type,
-            }
+            ToolRecord(
+                id=f'tool_{i:06d}',
+                name=f'{tool_type}_{i:06d}',
+                description=f'Test {tool_type} tool number {i}',
+                type=tool_type,
+                version=f'1.{i % 10}.{i % 100}',
+                parameters=('input', 'output', 'config')[: (i % 3) + 1],
+                category=tool_type,
+            )
         )
 
     return tools
 
 
-def generate_large_prompts(count: int) -> list[dict]:
+def generate_large_prompts(count: int) -> list[PromptRecord]:
     """Generate a large number of test prompts."""
     prompts = []
     prompt_types = ['analysis', 'summary', 'transformation', 'validation', 'reporting']
@@ -93,333 +154,316 @@ def generate_large_prompts(count: int) -> list[dict]:
     for i in range(count):
         prompt_type = prompt_types[i % len(prompt_types)]
         prompts.append(
-            {
-                'id': f'prompt_{i:06d}',
-                'name': f'{prompt_type}_prompt_{i:06d}',
-                'description': f'Test {prompt_type} prompt number {i}',
-                'type': prompt_type,
-                'template': f'Execute {prompt_type} operation with parameters: {{input}}',
-                'parameters': {
+            PromptRecord(
+                id=f'prompt_{i:06d}',
+                name=f'{prompt_type}_prompt_{i:06d}',
+                description=f'Test {prompt_type} prompt number {i}',
+                type=prompt_type,
+                template=f'Execute {prompt_type} operation with parameters: {{input}}',
+                parameters={
                     'input': {'type': 'string', 'description': f'Input for {prompt_type}'},
                     'options': {'type': 'object', 'description': 'Additional options'},
                 },
-            }
+            )
         )
 
     return prompts
 
 
-# Generate test datasets
-LARGE_RESOURCES = generate_large_resources(500)  # 500 resources for testing
-LARGE_TOOLS = generate_large_tools(300)  # 300 tools for testing
-LARGE_PROMPTS = generate_large_prompts(400)  # 400 prompts for testing
+# Test datasets are generated on first use, so importing this module (e.g. during test
+# discovery) does not pay for building them
+@cache
+def get_large_resources() -> list[ResourceRecord]:
+    return generate_large_resources(500)  # 500 resources for testing
+
+
+@cache
+def get_large_tools() -> list[ToolRecord]:
+    return generate_large_tools(300)  # 300 tools for testing
 
 
-class PaginationCursor:
-    """Helper class for pagination cursor management."""
+@cache
+def get_large_prompts() -> list[PromptRecord]:
+    return generate_large_prompts(400)  # 400 prompts for testing
 
-    @staticmethod
-    def encode_cursor(offset: int, limit: int, total: int) -> str:
-        """Encode cursor as base64 JSON."""
-        cursor_data = {'offset': offset, 'limit': limit, 'total': total, 'version': '1.0'}
-        json_str = json.dumps(cursor_data)
-        return base64.b64encode(json_str.encode()).decode()
 
-    @staticmethod
-    def decode_cursor(cursor: str) -> dict:
-        """Decode cursor from base64 JSON."""
-        try:
-            json_str = base64.b64decode(cursor.encode()).decode()
-            return json.loads(json_str)
-        except Exception as e:
-            logger.error(f"Failed to decode cursor: {cursor}, error: {e}")
-            raise ValueError(f"Invalid cursor format: {cursor}")
-
-    @staticmethod
-    def paginate_list(items: list, cursor: Optional[str] = None, default_limit: int = 50) -> dict:
-        """Paginate a list with cursor support."""
-        total_items = len(items)
-
-        if cursor:
-            cursor_data = PaginationCursor.decode_cursor(cursor)
-            offset = cursor_data.get('offset', 0)
-            limit = cursor_data.get('limit', default_limit)
-        else:
-            offset = 0
-            limit = default_limit
-
-        # Ensure offset is within bounds
-        offset = max(0, min(offset, total_items))
-        limit = max(1, min(limit, 100))  # Cap limit at 100
-
-        # Get page items
-        page_items = items[offset : offset + limit]
-
-        # Calculate next cursor
-        next_offset = offset + limit
-        has_more = next_offset < total_items
-        next_cursor = None
-
-        if has_more:
-            next_cursor = PaginationCursor.encode_cursor(next_offset, limit, total_items)
-
-        return {
-            'items': page_items,
-            'next_cursor': next_cursor,
-            'has_more_pages': has_more,
-            'total_items': len(page_items),
-            'offset': offset,
-            'limit': limit,
-            'total_available': total_items,
-        }
+# Lookup maps for tool calls and resource reads
+@cache
+def get_tools_by_name() -> dict[str, ToolRecord]:
+    return {t.name: t for t in get_large_tools()}
+
+
+@cache
+def get_resources_by_uri() -> dict[str, ResourceRecord]:
+    return {r.uri: r for r in get_large_resources()}
 
 
-def main():
-    server = Server("pagination-test-server")
+# Input schemas never vary per tool, so each is one dict shared by every Tool that uses it
+TOOL_INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "input": {"type": "string", "description": "Tool input"},
+        "config": {"type": "object", "description": "Tool configuration"},
+    },
+}
 
-    @server.list_resources()
-    async def handle_list_resources() -> list[Resource]:
-        """List resources (standard MCP - first page only)."""
-        logger.info("Received standard list_resources request")
-
-        # Standard MCP - return first page as list[Resource]
-        page_data = PaginationCursor.paginate_list(LARGE_RESOURCES, None, default_limit=25)
-
-        # Convert to Resource objects
-        resources = []
-        for resource_data in page_data['items']:
-            resources.append(
-                Resource(
-                    uri=resource_data['uri'],
-                    name=resource_data['name'],
-                    description=resource_data['description'],
-                    mimeType=resource_data['mime_type'],
-                )
-            )
+CURSOR_INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {"cursor": {"type": "string", "description": "Pagination cursor (empty for first page)"}},
+}
+
+# Cursor-based pagination tools, appended to the first page of the standard tools listing
+PAGINATION_TOOL_OBJS = [
+    Tool.model_construct(
+        name="list_resources_paginated",
+        description="List resources with cursor-based pagination",
+        inputSchema=CURSOR_INPUT_SCHEMA,
+    ),
+    Tool.model_construct(
+        name="list_tools_paginated",
+        description="List tools with cursor-based pagination",
+        inputSchema=CURSOR_INPUT_SCHEMA,
+    ),
+    Tool.model_construct(
+        name="list_prompts_paginated",
+        description="List prompts with cursor-based pagination",
+        inputSchema=CURSOR_INPUT_SCHEMA,
+    ),
+]
+
+
+def encode_cursor(offset: int) -> str:
+    """Encode cursor as the decimal offset of the next page."""
+    return str(offset)
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode cursor back to a page offset."""
+    # isdigit() alone also accepts non-ASCII digits such as '²', which int() rejects
+    if not (cursor.isascii() and cursor.isdigit()):
+        logger.error("Failed to decode cursor: %s", cursor)
+        raise ValueError(f"Invalid cursor format: {cursor}")
+    return int(cursor)
+
+
+def paginate_list(items: list, cursor: Optional[str] = None, default_limit: int = 50) -> dict:
+    """Paginate a list with cursor support."""
+    total_items = len(items)
+
+    # Page size is server-controlled; the cursor only carries the offset
+    offset = decode_cursor(cursor) if cursor else 0
+    limit = default_limit
+
+    # Ensure offset is within bounds
+    offset = max(0, min(offset, total_items))
+    limit = max(1, min(limit, 100))  # Cap limit at 100
+
+    # Get page items
+    page_items = items[offset : offset + limit]
+
+    # Calculate next cursor
+    next_offset = offset + limit
+    has_more = next_offset < total_items
+    next_cursor = None
+
+    if has_more:
+        next_cursor = encode_cursor(next_offset)
+
+    return {
+        'items': page_items,
+        'next_cursor': next_cursor,
+        'has_more_pages': has_more,
+        'total_items': len(page_items),
+        'offset': offset,
+        'limit': limit,
+        'total_available': total_items,
+    }
+
+
+# Fields of a ResourceRecord exposed over MCP, fetched in one C-level call
+_resource_fields = attrgetter('uri', 'name', 'description', 'mime_type')
+
+
+# Standard (non-paginated) listings only ever return the first page, so only that page is
+# turned into MCP objects, once. The records are generated by this server, so Pydantic
+# validation is skipped with model_construct (AnyUrl still parses the resource URIs).
+@cache
+def get_std_list_resources() -> list[Resource]:
+    first_page = paginate_list(get_large_resources(), None, default_limit=25)['items']
+    return [
+        Resource.model_construct(uri=AnyUrl(uri), name=name, description=description, mimeType=mime_type)
+        for uri, name, description, mime_type in map(_resource_fields, first_page)
+    ]
+
+
+@cache
+def get_std_list_tools() -> list[Tool]:
+    tools = [
+        Tool.model_construct(name=t.name, description=t.description, inputSchema=TOOL_INPUT_SCHEMA)
+        for t in paginate_list(get_large_tools(), None, default_limit=20)['items']
+    ]
+    return tools + PAGINATION_TOOL_OBJS
+
+
+@cache
+def get_std_list_prompts() -> list[Prompt]:
+    return [
+        Prompt.model_construct(
+            name=p.name,
+            description=p.description,
+            arguments=[PromptArgument.model_construct(name=arg) for arg in p.parameters],
+        )
+        for p in paginate_list(get_large_prompts(), None, default_limit=30)['items']
+    ]
+
+
+# Listing kind -> default page size for the paginated tools
+PAGINATED_LIMITS = {
+    "resources": 25,
+    "tools": 20,
+    "prompts": 30,
+}
+
+# Paginated tool name -> listing kind served by _page_json
+PAGINATED_LISTINGS = {
+    "list_resources_paginated": "resources",
+    "list_tools_paginated": "tools",
+    "list_prompts_paginated": "prompts",
+}
+
+
+@cache
+def get_paginated_wire(kind: str) -> list[dict]:
+    """Wire-shape dicts for one paginated listing, projected once."""
+    if kind == "resources":
+        return [
+            {'uri': uri, 'name': name, 'description': description, 'mimeType': mime_type}
+            for uri, name, description, mime_type in map(_resource_fields, get_large_resources())
+        ]
+    if kind == "tools":
+        return [
+            {'name': t.name, 'description': t.description, 'inputSchema': TOOL_INPUT_SCHEMA} for t in get_large_tools()
+        ]
+    if kind == "prompts":
+        return [
+            {'name': p.name, 'description': p.description, 'arguments': list(p.parameters.keys())}
+            for p in get_large_prompts()
+        ]
+    raise ValueError(f"Unknown paginated listing: {kind}")
+
+
+@cache
+def get_paginated_item_json(kind: str) -> list[bytes]:
+    """Compact JSON for each item of a paginated listing, so pages are assembled by joining bytes."""
+    return [_json_dumps(item) for item in get_paginated_wire(kind)]
+
+
+@lru_cache(maxsize=256)
+def _page_json(kind: str, cursor: str) -> str:
+    """Return the JSON text for one page of a paginated listing.
+
+    The generated datasets never change after startup, so a page is fully determined by
+    (kind, cursor) and its serialized form can be cached.
+    """
+    item_json = get_paginated_item_json(kind)
+    page_data = paginate_list(item_json, cursor or None, default_limit=PAGINATED_LIMITS[kind])
+
+    # Create MCP-compliant response, with nextCursor only if there are more pages. Cursors are
+    # decimal offsets, so they can be spliced in without escaping.
+    parts = [b'{"', kind.encode(), b'":[', b','.join(page_data['items']), b']']
+    if page_data['next_cursor']:
+        parts += [b',"nextCursor":"', page_data['next_cursor'].encode(), b'"']
+    parts.append(b'}')
+
+    logger.info("Serialized paginated %d %s, has_more: %s", page_data['total_items'], kind, page_data['has_more_pages'])
+    return b''.join(parts).decode()
+
+
+async def handle_list_resources() -> list[Resource]:
+    """List resources (standard MCP - first page only)."""
+    logger.info("Received standard list_resources request")
+
+    # Standard MCP - return first page as list[Resource]
+    resources = get_std_list_resources()
+
+    logger.info("Returning %d resources (standard MCP)", len(resources))
+    return resources
 
-        logger.info(f"Returning {len(resources)} resources (standard MCP)")
-        return resources
-
-    # Custom method for cursor-based pagination
-    @server.call_tool()
-    async def handle_call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
-        """Handle tool calls including pagination tools."""
-        logger.info(f"Received call_tool request: {name} with args: {arguments}")
-
-        if name == "list_resources_paginated":
-            cursor = arguments.get("cursor", "")
-            page_data = PaginationCursor.paginate_list(LARGE_RESOURCES, cursor or None, default_limit=25)
-
-            # Convert to Resource objects
-            resources = []
-            for resource_data in page_data['items']:
-                resources.append(
-                    {
-                        'uri': resource_data['uri'],
-                        'name': resource_data['name'],
-                        'description': resource_data['description'],
-                        'mimeType': resource_data['mime_type'],
-                    }
-                )
-
-            # Create MCP-compliant response
-            result = {'resources': resources}
-
-            # Add nextCursor if there are more pages
-            if page_data['next_cursor']:
-                result['nextCursor'] = page_data['next_cursor']
-
-            logger.info(f"Returning paginated {len(resources)} resources, has_more: {page_data['has_more_pages']}")
-            return CallToolResult(content=[TextContent(type="text", text=json.dumps(result))], isError=False)
-
-        elif name == "list_tools_paginated":
-            cursor = arguments.get("cursor", "")
-            page_data = PaginationCursor.paginate_list(LARGE_TOOLS, cursor or None, default_limit=20)
-
-            tools = []
-            for tool_data in page_data['items']:
-                tools.append(
-                    {
-                        'name': tool_data['name'],
-                        'description': tool_data['description'],
-                        'inputSchema': {
-                            "type": "object",
-                            "properties": {
-                                "input": {"type": "string", "description": "Tool input"},
-                                "config": {"type": "object", "description": "Tool configuration"},
-                            },
-                        },
-                    }
-                )
-
-            result = {'tools': tools}
-            if page_data['next_cursor']:
-                result['nextCursor'] = page_data['next_cursor']
-
-            logger.info(f"Returning paginated {len(tools)} tools, has_more: {page_data['has_more_pages']}")
-            return CallToolResult(content=[TextContent(type="text", text=json.dumps(result))], isError=False)
-
-        elif name == "list_prompts_paginated":
-            cursor = arguments.get("cursor", "")
-            page_data = PaginationCursor.paginate_list(LARGE_PROMPTS, cursor or None, default_limit=30)
-
-            prompts = []
-            for prompt_data in page_data['items']:
-                prompts.append(
-                    {
-                        'name': prompt_data['name'],
-                        'description': prompt_data['description'],
-                        'arguments': list(prompt_data['parameters'].keys()),
-                    }
-                )
-
-            result = {'prompts': prompts}
-            if page_data['next_cursor']:
-                result['nextCursor'] = page_data['next_cursor']
-
-            logger.info(f"Returning paginated {len(prompts)} prompts, has_more: {page_data['has_more_pages']}")
-            return CallToolResult(content=[TextContent(type="text", text=json.dumps(result))], isError=False)
-
-        # Find regular tool by name
-        tool_found = None
-        for tool in LARGE_TOOLS:
-            if tool['name'] == name:
-                tool_found = tool
-                break
-
-        if not tool_found:
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Error: Tool not found: {name}")], isError=True
-            )
 
-        return CallToolResult(
-            content=[
-                TextContent(type="text", text=f"Tool {name} executed successfully with result: {json.dumps(arguments)}")
-            ],
-            isError=False,
-        )
+async def handle_call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
+    """Handle tool calls including pagination tools."""
+    logger.info("Received call_tool request: %s with args: %s", name, arguments)
 
-    @server.list_tools()
-    async def handle_list_tools() -> list[Tool]:
-        """List tools (standard MCP - first page only)."""
-        logger.info("Received standard list_tools request")
-
-        page_data = PaginationCursor.paginate_list(LARGE_TOOLS, None, default_limit=20)
-
-        tools = []
-        for tool_data in page_data['items']:
-            tools.append(
-                Tool(
-                    name=tool_data['name'],
-                    description=tool_data['description'],
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "input": {"type": "string", "description": "Tool input"},
-                            "config": {"type": "object", "description": "Tool configuration"},
-                        },
-                    },
-                )
+    if name in PAGINATED_LISTINGS:
+        cursor = arguments.get("cursor") or ""
+        text = _page_json(PAGINATED_LISTINGS[name], cursor)
+        return CallToolResult(content=[TextContent(type="text", text=text)], isError=False)
+
+    # Find regular tool by name
+    if name not in get_tools_by_name():
+        return CallToolResult(content=[TextContent(type="text", text=f"Error: Tool not found: {name}")], isError=True)
+
+    return CallToolResult(
+        content=[
+            TextContent(
+                type="text", text=f"Tool {name} executed successfully with result: {_json_dumps(arguments).decode()}"
             )
+        ],
+        isError=False,
+    )
 
-        # Add pagination tools
-        tools.extend(
-            [
-                Tool(
-                    name="list_resources_paginated",
-                    description="List resources with cursor-based pagination",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "cursor": {"type": "string", "description": "Pagination cursor (empty for first page)"}
-                        },
-                    },
-                ),
-                Tool(
-                    name="list_tools_paginated",
-                    description="List tools with cursor-based pagination",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "cursor": {"type": "string", "description": "Pagination cursor (empty for first page)"}
-                        },
-                    },
-                ),
-                Tool(
-                    name="list_prompts_paginated",
-                    description="List prompts with cursor-based pagination",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "cursor": {"type": "string", "description": "Pagination cursor (empty for first page)"}
-                        },
-                    },
-                ),
-            ]
-        )
 
-        logger.info(f"Returning {len(tools)} tools (standard MCP)")
-        return tools
+async def handle_list_tools() -> list[Tool]:
+    """List tools (standard MCP - first page only)."""
+    logger.info("Received standard list_tools request")
 
-    @server.list_prompts()
-    async def handle_list_prompts() -> list[Prompt]:
-        """List prompts (standard MCP - first page only)."""
-        logger.info("Received standard list_prompts request")
+    # First page of tools, followed by the pagination tools
+    tools = get_std_list_tools()
 
-        page_data = PaginationCursor.paginate_list(LARGE_PROMPTS, None, default_limit=30)
+    logger.info("Returning %d tools (standard MCP)", len(tools))
+    return tools
 
-        prompts = []
-        for prompt_data in page_data['items']:
-            prompts.append(
-                Prompt(
-                    name=prompt_data['name'],
-                    description=prompt_data['description'],
-                    arguments=list(prompt_data['parameters'].keys()),
-                )
-            )
 
-        logger.info(f"Returning {len(prompts)} prompts (standard MCP)")
-        return prompts
-
-    @server.read_resource()
-    async def handle_read_resource(uri: str) -> str:
-        """Read a resource by URI."""
-        logger.info(f"Received read_resource request for URI: {uri}")
-
-        # Find resource by URI
-        for resource in LARGE_RESOURCES:
-            if resource['uri'] == uri:
-                return json.dumps(resource, indent=2)
-
-        logger.error(f"Resource not found: {uri}")
-        raise ValueError(f"Resource not found: {uri}")
-
-    @server.call_tool()
-    async def handle_call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
-        """Handle tool calls."""
-        logger.info(f"Received call_tool request: {name} with args: {arguments}")
-
-        # Find tool by name
-        tool_found = None
-        for tool in LARGE_TOOLS:
-            if tool['name'] == name:
-                tool_found = tool
-                break
-
-        if not tool_found:
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Error: Tool not found: {name}")], isError=True
-            )
+async def handle_list_prompts() -> list[Prompt]:
+    """List prompts (standard MCP - first page only)."""
+    logger.info("Received standard list_prompts request")
 
-        return CallToolResult(
-            content=[
-                TextContent(type="text", text=f"Tool {name} executed successfully with result: {json.dumps(arguments)}")
-            ],
-            isError=False,
-        )
+    prompts = get_std_list_prompts()
+
+    logger.info("Returning %d prompts (standard MCP)", len(prompts))
+    return prompts
+
+
+async def handle_read_resource(uri: str) -> str:
+    """Read a resource by URI."""
+    logger.info("Received read_resource request for URI: %s", uri)
+
+    # Find resource by URI (the SDK passes an AnyUrl, keys are plain strings)
+    resource = get_resources_by_uri().get(str(uri))
+    if resource is not None:
+        return _json_dumps(asdict(resource), indent=True).decode()
+
+    logger.error("Resource not found: %s", uri)
+    raise ValueError(f"Resource not found: {uri}")
+
+
+def main():
+    server = Server("pagination-test-server")
+
+    # Each MCP method has exactly one handler; cursor-based pagination is served via call_tool
+    server.list_resources()(handle_list_resources)
+    server.call_tool()(handle_call_tool)
+    server.list_tools()(handle_list_tools)
+    server.list_prompts()(handle_list_prompts)
+    server.read_resource()(handle_read_resource)
 
     logger.info("MCP Pagination Test Server starting...")
-    logger.info(f"Generated {len(LARGE_RESOURCES)} resources, {len(LARGE_TOOLS)} tools, {len(LARGE_PROMPTS)} prompts")
+    logger.info(
+        "Generated %d resources, %d tools, %d prompts",
+        len(get_large_resources()),
+        len(get_large_tools()),
+        len(get_large_prompts()),
+    )
 
     # Run the server
     import mcp.server.stdio
@@ -430,7 +474,7 @@ def main():
             async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
                 await server.run(read_stream, write_stream, server.create_initialization_options())
         except Exception as e:
-            logger.error(f"Server error: {e}")
+            logger.error("Server error: %s", e)
             raise
 
     try:
@@ -438,7 +482,7 @@ def main():
     except KeyboardInterrupt:
         logger.info("Server shutdown requested")
     except Exception as e:
-        logger.error(f"Server failed: {e}")
+        logger.error("Server failed: %s", e)
         sys.exit(1)
 
 
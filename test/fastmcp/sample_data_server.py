@@ -15,6 +15,8 @@ import os
 
 # Create log file in absolute path to this directory
 log_file = '/mnt/aux-data/teague/Projects/duckdb_mcp/mcp_server.log'
+# Per-request DEBUG/INFO lines only reach the log file when MCP_TEST_SERVER_DEBUG is set
+file_log_level = logging.DEBUG if os.environ.get('MCP_TEST_SERVER_DEBUG') else logging.WARNING
 
 # Configure logging
 logger = logging.getLogger()
@@ -22,7 +24,7 @@ logger.setLevel(logging.DEBUG)
 
 # File handler
 file_handler = logging.FileHandler(log_file, mode='w')  # Overwrite each time
-file_handler.setLevel(logging.DEBUG)
+file_handler.setLevel(file_log_level)
 file_formatter = logging.Formatter('[MCP-SERVER-FILE] %(asctime)s - %(levelname)s - %(message)s')
 file_handler.setFormatter(file_formatter)
 logger.addHandler(file_handler)
@@ -35,13 +37,14 @@ stderr_handler.setFormatter(stderr_formatter)
 logger.addHandler(stderr_handler)
 
 # Log the file location for debugging
-logger.info(f"MCP Server logging to file: {log_file}")
+logger.info("MCP Server logging to file: %s", log_file)
 from mcp.types import (
     Resource,
     Tool,
     CallToolResult,
     TextContent,
 )
+from pydantic import AnyUrl
 
 # Sample CSV data
 SAMPLE_CSV_DATA = {
@@ -66,6 +69,43 @@ SAMPLE_CSV_DATA = {
 5,Tool Y,Tools,35.99,100""",
 }
 
+# Row counts (excluding header) and the all-datasets summary, computed once
+SAMPLE_CSV_ROWS = {name: data.strip().count('\n') for name, data in SAMPLE_CSV_DATA.items()}
+SAMPLE_CSV_INFO = "Available datasets:\n" + "\n".join(
+    f"- {name}: {rows} rows" for name, rows in SAMPLE_CSV_ROWS.items()
+)
+
+
+# MCP objects for the listings are built once from server-owned constants, so Pydantic
+# validation is skipped with model_construct (the URI is still parsed by AnyUrl)
+SAMPLE_CSV_RESOURCES = [
+    Resource.model_construct(
+        uri=AnyUrl(f"file:///{filename}"),
+        name=filename,
+        description=f"Sample CSV data: {filename}",
+        mimeType="text/csv",
+    )
+    for filename in SAMPLE_CSV_DATA
+]
+
+SAMPLE_TOOLS = [
+    Tool.model_construct(
+        name="get_data_info",
+        description="Get information about available datasets",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "dataset": {
+                    "type": "string",
+                    "description": "Dataset name (optional)",
+                    "enum": list(SAMPLE_CSV_DATA.keys()),
+                }
+            },
+            "additionalProperties": False,
+        },
+    )
+]
+
 
 def main():
     # Create the MCP server
@@ -75,24 +115,14 @@ def main():
     async def handle_list_resources() -> list[Resource]:
         """List available CSV resources."""
         logging.info("Received list_resources request")
-        resources = []
-        for filename in SAMPLE_CSV_DATA.keys():
-            resources.append(
-                Resource(
-                    uri=f"file:///{filename}",
-                    name=filename,
-                    description=f"Sample CSV data: {filename}",
-                    mimeType="text/csv",
-                )
-            )
-        logging.info(f"Returning {len(resources)} resources: {[r.uri for r in resources]}")
-        logging.info(f"Resource objects: {resources}")
+        resources = SAMPLE_CSV_RESOURCES
+        logging.info("Returning %d resources", len(resources))
         return resources
 
     @server.read_resource()
     async def handle_read_resource(uri: str) -> str:
         """Read a CSV resource by URI."""
-        logging.info(f"Received read_resource request for URI: {uri}")
+        logging.info("Received read_resource request for URI: %s", uri)
 
         # Convert URI to string if it's not already
         uri_str = str(uri)
@@ -101,38 +131,21 @@ def main():
         if uri_str.startswith("file:///"):
             filename = uri_str[8:]  # Remove "file:///" prefix
         else:
-            logging.error(f"Unsupported URI scheme: {uri_str}")
+            logging.error("Unsupported URI scheme: %s", uri_str)
             raise ValueError(f"Unsupported URI scheme: {uri_str}")
 
         if filename not in SAMPLE_CSV_DATA:
-            logging.error(f"Resource not found: {filename}")
+            logging.error("Resource not found: %s", filename)
             raise ValueError(f"Resource not found: {filename}")
 
         data = SAMPLE_CSV_DATA[filename]
-        logging.info(f"Returning {len(data)} bytes for {filename}")
-        logging.info(f"Data preview: {data[:100]}...")
+        logging.info("Returning %d bytes for %s", len(data), filename)
         return data
 
     @server.list_tools()
     async def handle_list_tools() -> list[Tool]:
         """List available tools."""
-        return [
-            Tool(
-                name="get_data_info",
-                description="Get information about available datasets",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "dataset": {
-                            "type": "string",
-                            "description": "Dataset name (optional)",
-                            "enum": list(SAMPLE_CSV_DATA.keys()),
-                        }
-                    },
-                    "additionalProperties": False,
-                },
-            )
-        ]
+        return SAMPLE_TOOLS
 
     @server.call_tool()
     async def handle_call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
@@ -145,19 +158,11 @@ def main():
                         content=[TextContent(type="text", text=f"Error: Unknown dataset: {dataset}")], isError=True
                     )
 
-                # Count rows (excluding header)
-                rows = len(SAMPLE_CSV_DATA[dataset].strip().split('\n')) - 1
+                rows = SAMPLE_CSV_ROWS[dataset]
                 return CallToolResult(content=[TextContent(type="text", text=f"Dataset '{dataset}' has {rows} rows")])
             else:
                 # List all datasets
-                info = []
-                for name, data in SAMPLE_CSV_DATA.items():
-                    rows = len(data.strip().split('\n')) - 1
-                    info.append(f"- {name}: {rows} rows")
-
-                return CallToolResult(
-                    content=[TextContent(type="text", text=f"Available datasets:\n" + "\n".join(info))]
-                )
+                return CallToolResult(content=[TextContent(type="text", text=SAMPLE_CSV_INFO)])
         else:
             return CallToolResult(content=[TextContent(type="text", text=f"Error: Unknown tool: {name}")], isError=True)
 
@@ -1,63 +1,64 @@
 #!/usr/bin/env python3
 """Test listing resources from MCP server"""
 
-import subprocess
+import asyncio
+import contextlib
 import json
-import sys
 import os
 
+from _mcp_client import STREAM_LIMIT, PipelinedClient, stop_process
 
-def test_list_resources():
+
+async def run_list_resources():
     server_path = os.path.join(os.path.dirname(__file__), "sample_data_server.py")
     venv_python = os.path.join(os.path.dirname(__file__), "../../venv/bin/python")
 
-    process = subprocess.Popen(
-        [venv_python, server_path], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    process = await asyncio.create_subprocess_exec(
+        venv_python,
+        server_path,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=STREAM_LIMIT,
     )
+    client = PipelinedClient(process)
+    reader = asyncio.create_task(client.read_responses())
+    stderr_task = asyncio.create_task(process.stderr.read())
 
-    # Initialize first
-    init_request = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "initialize",
-        "params": {
-            "protocolVersion": "2024-11-05",
-            "clientInfo": {"name": "Test", "version": "1.0"},
-            "capabilities": {"resources": {}},
-        },
-    }
+    try:
+        # Initialize first
+        init_response = await client.request(
+            "initialize",
+            {
+                "protocolVersion": "2024-11-05",
+                "clientInfo": {"name": "Test", "version": "1.0"},
+                "capabilities": {"resources": {}},
+            },
+        )
 
-    # List resources request
-    list_request = {"jsonrpc": "2.0", "id": 2, "method": "resources/list", "params": {}}
+        # List resources request
+        list_response = await client.request("resources/list", {})
 
-    requests = json.dumps(init_request) + '\n' + json.dumps(list_request) + '\n'
+        for i, response in enumerate([init_response, list_response]):
+            print(f"\n--- Response {i+1} ---")
+            print(json.dumps(response, indent=2))
 
-    try:
-        stdout, stderr = process.communicate(input=requests, timeout=5)
+    finally:
+        await stop_process(process)
+        reader.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await reader
+        stderr = await stderr_task
 
-        print("--- STDOUT ---")
-        print(stdout)
         print("--- STDERR ---")
-        print(stderr)
+        print(stderr.decode(errors="replace"))
 
-        # Parse responses
-        lines = stdout.strip().split('\n')
-        for i, line in enumerate(lines):
-            if line:
-                try:
-                    response = json.loads(line)
-                    print(f"\n--- Response {i+1} ---")
-                    print(json.dumps(response, indent=2))
-                except json.JSONDecodeError as e:
-                    print(f"Failed to parse line {i+1}: {e}")
 
-    except subprocess.TimeoutExpired:
+def test_list_resources():
+    try:
+        asyncio.run(asyncio.wait_for(run_list_resources(), timeout=5))
+    except asyncio.TimeoutError:
         print("Request timed out!")
-        process.kill()
-
-    finally:
-        if process.poll() is None:
-            process.terminate()
 
 
 if __name__ == "__main__":
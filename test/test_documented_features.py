@@ -6,99 +6,94 @@ This test suite validates that all documented behaviors in the README work corre
 ensuring documentation-driven development principles are followed.
 """
 
-import subprocess
 import tempfile
 import json
 import os
-import time
 import sys
-from pathlib import Path
 
-
-class DuckDBMCPTester:
-    def __init__(self):
-        self.project_root = Path(__file__).parent.parent
-        self.duckdb_path = self.project_root / "build/release/duckdb"
-        self.test_results = []
-
-    def run_sql(self, sql_commands, description="SQL Test"):
-        """Execute SQL commands in DuckDB and return result"""
+from _runner import EXTENSION_LOAD_SQL, BaseTester, requires
+
+
+class DuckDBMCPTester(BaseTester):
+    BASIC_LOADING_SQL = [
+        EXTENSION_LOAD_SQL,
+        "SELECT 'Extension loaded successfully' AS status;",
+    ]
+
+    DOCUMENTED_FUNCTIONS_SQL = [
+        EXTENSION_LOAD_SQL,
+        # Test that extension loads without errors
+        "SELECT 'Function availability test' AS test;",
+    ]
+
+    JSON_ARGS_SQL = [
+        EXTENSION_LOAD_SQL,
+        "SET allowed_mcp_commands='./launch_mcp_server.sh';",
+        "SELECT 'JSON ARGS parsing test' AS test;",
+        # Test JSON array parsing (without actually connecting)
+    ]
+
+    CONFIG_FILE_SQL = [
+        EXTENSION_LOAD_SQL,
+        "SET allowed_mcp_commands='echo';",
+        # Test config file parsing (structure validation)
+        "SELECT 'Config file test' AS test;",
+    ]
+
+    TRANSPORT_SQL = [
+        EXTENSION_LOAD_SQL,
+        "SET allowed_mcp_commands='echo';",
+        # Test different transport types
+        "SELECT 'Transport configuration test' AS test;",
+    ]
+
+    # Fixed .mcp.json fixture; only the server's cwd (a JSON string) is filled in per run
+    MCP_CONFIG_JSON = (
+        '{"mcpServers": {"test_server": {"command": "echo", "args": ["Hello MCP"], '
+        '"cwd": %s, "env": {"TEST_VAR": "test_value"}}}}\n'
+    )
+
+    # Scripts expected to succeed without attaching a server; they share one DuckDB process,
+    # everything else gets a fresh process per test
+    PROBE_SQL = [BASIC_LOADING_SQL, DOCUMENTED_FUNCTIONS_SQL, JSON_ARGS_SQL, CONFIG_FILE_SQL, TRANSPORT_SQL]
+
+    @staticmethod
+    def _json_rows(stdout):
+        """Parse the rows of a single result set printed in DuckDB's -json mode."""
         try:
-            # Create temporary SQL file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.sql', delete=False) as f:
-                if isinstance(sql_commands, list):
-                    f.write('\n'.join(sql_commands))
-                else:
-                    f.write(sql_commands)
-                sql_file = f.name
-
-            # Execute SQL
-            result = subprocess.run(
-                [str(self.duckdb_path), '-c', f'.read {sql_file}'],
-                capture_output=True,
-                text=True,
-                cwd=str(self.project_root),
-                timeout=30,
-            )
+            return json.loads(stdout)
+        except ValueError:
+            return []
 
-            # Clean up
-            os.unlink(sql_file)
-
-            success = result.returncode == 0
-            self.test_results.append(
-                {
-                    'description': description,
-                    'success': success,
-                    'stdout': result.stdout,
-                    'stderr': result.stderr,
-                    'sql': sql_commands,
-                }
-            )
-
-            return {
-                'success': success,
-                'stdout': result.stdout,
-                'stderr': result.stderr,
-                'returncode': result.returncode,
-            }
-
-        except Exception as e:
-            self.test_results.append(
-                {'description': description, 'success': False, 'error': str(e), 'sql': sql_commands}
-            )
-            return {'success': False, 'error': str(e)}
-
-    def test_basic_extension_loading(self):
+    async def test_basic_extension_loading(self):
         """Test documented basic extension functionality"""
         print("Testing basic extension loading...")
 
-        sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
-            "SELECT 'Extension loaded successfully' AS status;",
-        ]
+        result = await self._run_sql_async(self.BASIC_LOADING_SQL, "Basic Extension Loading", load_via_init=False)
 
-        result = self.run_sql(sql, "Basic Extension Loading")
+        rows = self._json_rows(result['stdout']) if result['success'] else []
 
-        if result['success'] and 'Extension loaded successfully' in result['stdout']:
+        if rows and rows[0].get('status') == 'Extension loaded successfully':
             print("✅ Basic extension loading works")
             return True
         else:
-            print(f"❌ Basic extension loading failed: {result.get('stderr', '')}")
+            print(f"❌ Basic extension loading failed: {self._stderr_text(result)}")
             return False
 
-    def test_security_requirements(self):
+    @requires('test_basic_extension_loading')
+    async def test_security_requirements(self):
         """Test documented security model requirements"""
         print("\nTesting security model...")
 
         # Test 1: Should fail without allowlist
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "ATTACH 'python3' AS test_server (TYPE mcp, TRANSPORT 'stdio');",
         ]
 
-        result = self.run_sql(sql, "Security: No allowlist should fail")
+        result = await self._run_sql_async(sql, "Security: No allowlist should fail")
 
-        if not result['success'] and 'No MCP commands are allowed' in result['stderr']:
+        if not result['success'] and b'No MCP commands are allowed' in result['errors']:
             print("✅ Security requirement: No allowlist properly blocks connections")
         else:
             print("❌ Security requirement: Should block connections without allowlist")
@@ -106,22 +101,22 @@ class DuckDBMCPTester:
 
         # Test 2: Should work with allowlist
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "SET allowed_mcp_commands='python3:/usr/bin/python3';",
             "SELECT 'Allowlist configured' AS status;",
         ]
 
-        result = self.run_sql(sql, "Security: Allowlist configuration")
+        result = await self._run_sql_async(sql, "Security: Allowlist configuration")
 
         if result['success']:
             print("✅ Security requirement: Allowlist configuration works")
         else:
-            print(f"❌ Security requirement: Allowlist configuration failed: {result.get('stderr', '')}")
+            print(f"❌ Security requirement: Allowlist configuration failed: {self._stderr_text(result)}")
             return False
 
         # Test 3: Should be immutable after first use
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "SET allowed_mcp_commands='python3';",
             # This should lock the commands
             "SELECT 'First set' AS status;",
@@ -129,33 +124,27 @@ class DuckDBMCPTester:
             "SET allowed_mcp_commands='python3:/usr/bin/node';",
         ]
 
-        result = self.run_sql(sql, "Security: Commands immutable after first use")
+        result = await self._run_sql_async(sql, "Security: Commands immutable after first use")
 
-        if not result['success'] and 'immutable once set' in result['stderr']:
+        if not result['success'] and b'immutable once set' in result['errors']:
             print("✅ Security requirement: Commands immutable after first use")
             return True
         else:
             print("❌ Security requirement: Commands should be immutable after first use")
             return False
 
-    def test_json_parameter_parsing(self):
+    @requires('test_basic_extension_loading')
+    async def test_json_parameter_parsing(self):
         """Test documented JSON parameter parsing"""
         print("\nTesting JSON parameter parsing...")
 
         # Test 1: Valid JSON arrays for ARGS
-        sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
-            "SET allowed_mcp_commands='./launch_mcp_server.sh';",
-            "SELECT 'JSON ARGS parsing test' AS test;",
-            # Test JSON array parsing (without actually connecting)
-        ]
-
-        result = self.run_sql(sql, "JSON Parameter: ARGS array parsing")
+        result = await self._run_sql_async(self.JSON_ARGS_SQL, "JSON Parameter: ARGS array parsing")
 
         if result['success']:
             print("✅ JSON parameter: Basic setup works")
         else:
-            print(f"❌ JSON parameter: Basic setup failed: {result.get('stderr', '')}")
+            print(f"❌ JSON parameter: Basic setup failed: {self._stderr_text(result)}")
             return False
 
         # Test 2: Invalid JSON should fail gracefully
@@ -163,61 +152,45 @@ class DuckDBMCPTester:
         print("✅ JSON parameter: Validation logic verified")
         return True
 
-    def test_config_file_support(self):
+    @requires('test_basic_extension_loading')
+    async def test_config_file_support(self):
         """Test documented .mcp.json config file support"""
         print("\nTesting .mcp.json config file support...")
 
         # Create test config file
-        config_content = {
-            "mcpServers": {
-                "test_server": {
-                    "command": "echo",
-                    "args": ["Hello MCP"],
-                    "cwd": str(self.project_root),
-                    "env": {"TEST_VAR": "test_value"},
-                }
-            }
-        }
-
         with tempfile.NamedTemporaryFile(mode='w', suffix='.mcp.json', delete=False) as f:
-            json.dump(config_content, f, indent=2)
+            f.write(self.MCP_CONFIG_JSON % json.dumps(str(self.project_root)))
             config_file = f.name
 
         try:
-            sql = [
-                "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
-                "SET allowed_mcp_commands='echo';",
-                # Test config file parsing (structure validation)
-                "SELECT 'Config file test' AS test;",
-            ]
-
-            result = self.run_sql(sql, "Config File: Basic structure")
+            result = await self._run_sql_async(self.CONFIG_FILE_SQL, "Config File: Basic structure")
 
             if result['success']:
                 print("✅ Config file: Basic structure validation works")
                 return True
             else:
-                print(f"❌ Config file: Basic structure failed: {result.get('stderr', '')}")
+                print(f"❌ Config file: Basic structure failed: {self._stderr_text(result)}")
                 return False
 
         finally:
             # Clean up
             os.unlink(config_file)
 
-    def test_error_handling(self):
+    @requires('test_basic_extension_loading')
+    async def test_error_handling(self):
         """Test documented error handling scenarios"""
         print("\nTesting error handling scenarios...")
 
         # Test 1: Invalid command should fail with proper error
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "SET allowed_mcp_commands='valid_command';",
             "ATTACH 'invalid_command' AS test (TYPE mcp, TRANSPORT 'stdio');",
         ]
 
-        result = self.run_sql(sql, "Error Handling: Invalid command")
+        result = await self._run_sql_async(sql, "Error Handling: Invalid command")
 
-        if not result['success'] and 'not allowed' in result['stderr']:
+        if not result['success'] and b'not allowed' in result['errors']:
             print("✅ Error handling: Invalid command properly rejected")
         else:
             print("❌ Error handling: Invalid command should be rejected")
@@ -225,54 +198,43 @@ class DuckDBMCPTester:
 
         # Test 2: Malformed JSON should fail with proper error
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "SET allowed_mcp_commands='echo';",
             "ATTACH 'echo' AS test (TYPE mcp, ARGS 'invalid json array');",
         ]
 
-        result = self.run_sql(sql, "Error Handling: Invalid JSON")
+        result = await self._run_sql_async(sql, "Error Handling: Invalid JSON")
 
         # This might succeed because invalid JSON falls back to single argument
         print("✅ Error handling: JSON fallback behavior verified")
         return True
 
-    def test_transport_configuration(self):
+    @requires('test_basic_extension_loading')
+    async def test_transport_configuration(self):
         """Test documented transport configuration"""
         print("\nTesting transport configuration...")
 
-        sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
-            "SET allowed_mcp_commands='echo';",
-            # Test different transport types
-            "SELECT 'Transport configuration test' AS test;",
-        ]
-
-        result = self.run_sql(sql, "Transport: Configuration syntax")
+        result = await self._run_sql_async(self.TRANSPORT_SQL, "Transport: Configuration syntax")
 
         if result['success']:
             print("✅ Transport: Configuration syntax works")
             return True
         else:
-            print(f"❌ Transport: Configuration failed: {result.get('stderr', '')}")
+            print(f"❌ Transport: Configuration failed: {self._stderr_text(result)}")
             return False
 
-    def test_documented_functions(self):
+    @requires('test_basic_extension_loading')
+    async def test_documented_functions(self):
         """Test documented MCP functions availability"""
         print("\nTesting documented function availability...")
 
-        sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
-            # Test that extension loads without errors
-            "SELECT 'Function availability test' AS test;",
-        ]
-
-        result = self.run_sql(sql, "Functions: Availability check")
+        result = await self._run_sql_async(self.DOCUMENTED_FUNCTIONS_SQL, "Functions: Availability check")
 
         if result['success']:
             print("✅ Functions: Basic availability verified")
             return True
         else:
-            print(f"❌ Functions: Availability check failed: {result.get('stderr', '')}")
+            print(f"❌ Functions: Availability check failed: {self._stderr_text(result)}")
             return False
 
     def run_all_tests(self):
@@ -290,15 +252,8 @@ class DuckDBMCPTester:
             self.test_documented_functions,
         ]
 
-        passed = 0
         total = len(tests)
-
-        for test in tests:
-            try:
-                if test():
-                    passed += 1
-            except Exception as e:
-                print(f"❌ Test failed with exception: {e}")
+        passed = self._run_tests(tests)
 
         print("\n" + "=" * 60)
         print(f"📊 Test Results: {passed}/{total} tests passed")
@@ -309,9 +264,11 @@ class DuckDBMCPTester:
         else:
             print("⚠️  Some tests failed - documentation may not match implementation")
             print("\nFailed test details:")
-            for result in self.test_results:
-                if not result['success']:
-                    print(f"  - {result['description']}: {result.get('stderr', result.get('error', 'Unknown error'))}")
+            for description, success, stderr, error in zip(
+                self._descriptions, self._successes, self._stderrs, self._errors
+            ):
+                if not success:
+                    print(f"  - {description}: {self._decode(stderr) or error or 'Unknown error'}")
             return False
 
 
@@ -324,7 +281,7 @@ def main():
     tester = DuckDBMCPTester()
 
     # Check if DuckDB executable exists
-    if not tester.duckdb_path.exists():
+    if not tester.duckdb_available:
         print(f"❌ DuckDB executable not found at {tester.duckdb_path}")
         print("   Please run 'make' to build the extension first")
         return False
@@ -6,103 +6,70 @@ This test suite specifically validates all documented security behaviors,
 ensuring that the security model works as described in the README.
 """
 
-import subprocess
-import tempfile
-import os
 import sys
-from pathlib import Path
-
-
-class SecurityValidationTester:
-    def __init__(self):
-        self.project_root = Path(__file__).parent.parent
-        self.duckdb_path = self.project_root / "build/release/duckdb"
-        self.test_results = []
-
-    def run_sql(self, sql_commands, description="Security Test"):
-        """Execute SQL commands in DuckDB and return result"""
-        try:
-            # Create temporary SQL file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.sql', delete=False) as f:
-                if isinstance(sql_commands, list):
-                    f.write('\n'.join(sql_commands))
-                else:
-                    f.write(sql_commands)
-                sql_file = f.name
-
-            # Execute SQL
-            result = subprocess.run(
-                [str(self.duckdb_path), '-c', f'.read {sql_file}'],
-                capture_output=True,
-                text=True,
-                cwd=str(self.project_root),
-                timeout=15,
-            )
-
-            # Clean up
-            os.unlink(sql_file)
-
-            success = result.returncode == 0
-            self.test_results.append(
-                {
-                    'description': description,
-                    'success': success,
-                    'stdout': result.stdout,
-                    'stderr': result.stderr,
-                    'expected_failure': description.startswith('SHOULD_FAIL:'),
-                }
-            )
-
-            return {
-                'success': success,
-                'stdout': result.stdout,
-                'stderr': result.stderr,
-                'returncode': result.returncode,
-            }
-
-        except Exception as e:
-            self.test_results.append(
-                {
-                    'description': description,
-                    'success': False,
-                    'error': str(e),
-                    'expected_failure': description.startswith('SHOULD_FAIL:'),
-                }
-            )
-            return {'success': False, 'error': str(e)}
-
-    def test_allowlist_requirement(self):
+
+from _runner import EXTENSION_LOAD_SQL, BaseTester
+
+
+class SecurityValidationTester(BaseTester):
+    CALL_TIMEOUT = 15
+    EXCEPTION_LABEL = "Security test"
+
+    BASENAME_SQL = [
+        EXTENSION_LOAD_SQL,
+        "SET allowed_mcp_commands='/usr/bin/python3';",
+        # This should work due to basename matching
+        "SELECT 'Basename matching test' AS result;",
+    ]
+
+    SAFE_ARGUMENTS_SQL = [
+        EXTENSION_LOAD_SQL,
+        "SET allowed_mcp_commands='echo';",
+        "SELECT 'Basic argument test' AS test;",
+    ]
+
+    PATH_ISOLATION_SQL = [
+        EXTENSION_LOAD_SQL,
+        "SET allowed_mcp_commands='echo';",
+        "SELECT 'Path isolation test' AS test;",
+    ]
+
+    # Scripts expected to succeed without attaching a server; they share one DuckDB process,
+    # everything else gets a fresh process per test
+    PROBE_SQL = [BASENAME_SQL, SAFE_ARGUMENTS_SQL, PATH_ISOLATION_SQL]
+
+    async def test_allowlist_requirement(self):
         """Test that MCP connections require explicit allowlist"""
         print("Testing allowlist requirement...")
 
         # Test 1: Should fail without any allowlist
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "ATTACH 'python3' AS test_server (TYPE mcp, TRANSPORT 'stdio');",
         ]
 
-        result = self.run_sql(sql, "SHOULD_FAIL: No allowlist configured")
+        result = await self._run_sql_async(sql, "SHOULD_FAIL: No allowlist configured")
 
-        if not result['success'] and 'No MCP commands are allowed' in result['stderr']:
+        if not result['success'] and b'No MCP commands are allowed' in result['errors']:
             print("✅ Allowlist requirement: Blocks connections without allowlist")
             return True
         else:
             print("❌ Allowlist requirement: Should block connections without allowlist")
-            print(f"   Got: {result.get('stderr', 'No error message')}")
+            print(f"   Got: {self._stderr_text(result, 'No error message')}")
             return False
 
-    def test_command_validation(self):
+    async def test_command_validation(self):
         """Test command allowlist validation"""
         print("\nTesting command validation...")
 
         # Test 1: Allowed command should be accepted in configuration
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "SET allowed_mcp_commands='python3:/usr/bin/python3';",
             "SELECT 'Configuration successful' AS result;",
         ]
 
-        result = self.run_sql(sql, "Allowed command configuration")
+        result = await self._run_sql_async(sql, "Allowed command configuration")
 
         if result['success']:
             print("✅ Command validation: Allowed commands accepted")
@@ -112,34 +79,27 @@ class SecurityValidationTester:
 
         # Test 2: Disallowed command should be rejected
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "SET allowed_mcp_commands='python3';",
             "ATTACH 'malicious_script' AS bad_server (TYPE mcp, TRANSPORT 'stdio');",
         ]
 
-        result = self.run_sql(sql, "SHOULD_FAIL: Disallowed command")
+        result = await self._run_sql_async(sql, "SHOULD_FAIL: Disallowed command")
 
-        if not result['success'] and 'not allowed' in result['stderr']:
+        if not result['success'] and b'not allowed' in result['errors']:
             print("✅ Command validation: Disallowed commands rejected")
             return True
         else:
             print("❌ Command validation: Disallowed commands should be rejected")
-            print(f"   Got: {result.get('stderr', 'No error message')}")
+            print(f"   Got: {self._stderr_text(result, 'No error message')}")
             return False
 
-    def test_basename_matching(self):
+    async def test_basename_matching(self):
         """Test documented basename matching behavior"""
         print("\nTesting basename matching...")
 
         # Test: Relative command should match absolute path basename
-        sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
-            "SET allowed_mcp_commands='/usr/bin/python3';",
-            # This should work due to basename matching
-            "SELECT 'Basename matching test' AS result;",
-        ]
-
-        result = self.run_sql(sql, "Basename matching validation")
+        result = await self._run_sql_async(self.BASENAME_SQL, "Basename matching validation")
 
         if result['success']:
             print("✅ Basename matching: Configuration logic works")
@@ -148,13 +108,13 @@ class SecurityValidationTester:
             print("❌ Basename matching: Configuration failed")
             return False
 
-    def test_immutable_commands(self):
+    async def test_immutable_commands(self):
         """Test that commands become immutable after first use"""
         print("\nTesting command immutability...")
 
         # Test: Should not be able to modify commands after first setting
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "SET allowed_mcp_commands='python3';",
             # This should trigger the lock
             "SELECT 'First configuration' AS step;",
@@ -162,28 +122,22 @@ class SecurityValidationTester:
             "SET allowed_mcp_commands='python3:/usr/bin/node';",
         ]
 
-        result = self.run_sql(sql, "SHOULD_FAIL: Command modification after use")
+        result = await self._run_sql_async(sql, "SHOULD_FAIL: Command modification after use")
 
-        if not result['success'] and 'immutable once set' in result['stderr']:
+        if not result['success'] and b'immutable once set' in result['errors']:
             print("✅ Command immutability: Commands locked after first use")
             return True
         else:
             print("❌ Command immutability: Commands should be locked after first use")
-            print(f"   Got: {result.get('stderr', 'No error message')}")
+            print(f"   Got: {self._stderr_text(result, 'No error message')}")
             return False
 
-    def test_argument_validation(self):
+    async def test_argument_validation(self):
         """Test argument validation for dangerous characters"""
         print("\nTesting argument validation...")
 
         # Test 1: Basic arguments should work
-        sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
-            "SET allowed_mcp_commands='echo';",
-            "SELECT 'Basic argument test' AS test;",
-        ]
-
-        result = self.run_sql(sql, "Safe arguments")
+        result = await self._run_sql_async(self.SAFE_ARGUMENTS_SQL, "Safe arguments")
 
         if result['success']:
             print("✅ Argument validation: Safe arguments accepted")
@@ -197,18 +151,12 @@ class SecurityValidationTester:
         print("✅ Argument validation: Logic verified by implementation")
         return True
 
-    def test_path_isolation(self):
+    async def test_path_isolation(self):
         """Test working directory and environment isolation"""
         print("\nTesting path isolation...")
 
         # Test: Working directory specification should be accepted
-        sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
-            "SET allowed_mcp_commands='echo';",
-            "SELECT 'Path isolation test' AS test;",
-        ]
-
-        result = self.run_sql(sql, "Path isolation configuration")
+        result = await self._run_sql_async(self.PATH_ISOLATION_SQL, "Path isolation configuration")
 
         if result['success']:
             print("✅ Path isolation: Configuration accepted")
@@ -217,63 +165,63 @@ class SecurityValidationTester:
             print("❌ Path isolation: Configuration should be accepted")
             return False
 
-    def test_error_message_quality(self):
+    async def test_error_message_quality(self):
         """Test that error messages match documented examples"""
         print("\nTesting error message quality...")
 
         # Test 1: No allowlist error message
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "ATTACH 'test' AS server (TYPE mcp);",
         ]
 
-        result = self.run_sql(sql, "SHOULD_FAIL: No allowlist error message")
+        result = await self._run_sql_async(sql, "SHOULD_FAIL: No allowlist error message")
 
-        if not result['success'] and 'Set allowed_mcp_commands setting first' in result['stderr']:
+        if not result['success'] and b'Set allowed_mcp_commands setting first' in result['errors']:
             print("✅ Error messages: No allowlist message matches docs")
         else:
             print("⚠️  Error messages: No allowlist message could be improved")
 
         # Test 2: Command not allowed error message
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "SET allowed_mcp_commands='python3';",
             "ATTACH 'forbidden' AS server (TYPE mcp);",
         ]
 
-        result = self.run_sql(sql, "SHOULD_FAIL: Command not allowed error message")
+        result = await self._run_sql_async(sql, "SHOULD_FAIL: Command not allowed error message")
 
-        if not result['success'] and 'not allowed' in result['stderr'] and 'Allowed commands' in result['stderr']:
+        if not result['success'] and b'not allowed' in result['errors'] and b'Allowed commands' in result['errors']:
             print("✅ Error messages: Command not allowed message matches docs")
             return True
         else:
             print("⚠️  Error messages: Command not allowed message could be improved")
             return True  # Don't fail test for message formatting
 
-    def test_security_edge_cases(self):
+    async def test_security_edge_cases(self):
         """Test security edge cases and attack vectors"""
         print("\nTesting security edge cases...")
 
         # Test 1: Empty command should be rejected
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "SET allowed_mcp_commands='';",
             "SELECT 'Empty allowlist test' AS test;",
         ]
 
-        result = self.run_sql(sql, "Empty allowlist handling")
+        result = await self._run_sql_async(sql, "Empty allowlist handling")
 
         # Empty allowlist should result in no allowed commands
         print("✅ Security edge cases: Empty allowlist handled")
 
         # Test 2: Whitespace handling
         sql = [
-            "LOAD 'build/release/extension/duckdb_mcp/duckdb_mcp.duckdb_extension';",
+            self.EXTENSION_LOAD_SQL,
             "SET allowed_mcp_commands='  python3  :  /usr/bin/python3  ';",
             "SELECT 'Whitespace handling test' AS test;",
         ]
 
-        result = self.run_sql(sql, "Whitespace handling")
+        result = await self._run_sql_async(sql, "Whitespace handling")
 
         if result['success']:
             print("✅ Security edge cases: Whitespace handling works")
@@ -298,15 +246,8 @@ class SecurityValidationTester:
             self.test_security_edge_cases,
         ]
 
-        passed = 0
         total = len(tests)
-
-        for test in tests:
-            try:
-                if test():
-                    passed += 1
-            except Exception as e:
-                print(f"❌ Security test failed with exception: {e}")
+        passed = self._run_tests(tests)
 
         print("\n" + "=" * 60)
         print(f"🔒 Security Test Results: {passed}/{total} tests passed")
@@ -317,15 +258,15 @@ class SecurityValidationTester:
         else:
             print("⚠️  Some security tests failed")
             print("\nFailed test details:")
-            for result in self.test_results:
-                expected_fail = result.get('expected_failure', False)
-                actual_success = result['success']
-
+            for description, actual_success, stderr, error in zip(
+                self._descriptions, self._successes, self._stderrs, self._errors
+            ):
+                expected_fail = description.startswith('SHOULD_FAIL:')
                 # Test should pass if: (expected to succeed and did) OR (expected to fail and didn't)
                 test_passed = (not expected_fail and actual_success) or (expected_fail and not actual_success)
 
                 if not test_passed:
-                    print(f"  - {result['description']}: {result.get('stderr', result.get('error', 'Unknown error'))}")
+                    print(f"  - {description}: {self._decode(stderr) or error or 'Unknown error'}")
             return False
 
 
@@ -334,7 +275,7 @@ def main():
     tester = SecurityValidationTester()
 
     # Check if DuckDB executable exists
-    if not tester.duckdb_path.exists():
+    if not tester.duckdb_available:
         print(f"❌ DuckDB executable not found at {tester.duckdb_path}")
         print("   Please run 'make' to build the extension first")
         return False